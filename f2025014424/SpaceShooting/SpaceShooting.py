@@ -1,8 +1,20 @@
 from tkinter import *
-import os, random, time, math
+import os, sys, gc, random, time, math, argparse, heapq
+from collections import deque
 import pygame
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import telemetry
+import netplay
+import bots
+from headless import HeadlessRoot, HeadlessCanvas
+
 TARGET = 100
+TICK_MS = 30
 SPAWN_MARGIN = TARGET // 2
 
 PLAYER_SPEED = 10
@@ -11,6 +23,7 @@ ENEMY_DOWN_SPEED = 1.6
 
 SHOOT_DELAY = 400
 ENEMY_BASE_COOLDOWN = 1600
+ENEMY_COOLDOWN_SCALE = {1: 2.0, 2: 2.4, 99: 1.0}
 INVINCIBLE_TIME = 1500
 
 MAX_HP = 3
@@ -24,9 +37,62 @@ GUARD_HIT_COST = 35
 GUARD_REGEN_PER_SEC = 22
 GUARD_BREAK_COOLDOWN = 900
 
+KEY_BINDINGS = [
+    {"left": ["Left"], "right": ["Right"], "up": ["Up"], "down": ["Down"],
+     "fire": ["Control_L", "Control_R"], "shotgun": ["z"], "guard": ["Shift_L", "Shift_R"]},
+]
+COOP_KEY_BINDINGS = [
+    {"left": ["Left"], "right": ["Right"], "up": ["Up"], "down": ["Down"],
+     "fire": ["Control_R"], "shotgun": ["slash"], "guard": ["Shift_R"]},
+    {"left": ["a"], "right": ["d"], "up": ["w"], "down": ["s"],
+     "fire": ["Control_L"], "shotgun": ["q"], "guard": ["Shift_L"]},
+    {"left": ["KP_4", "KP_Left"], "right": ["KP_6", "KP_Right"], "up": ["KP_8", "KP_Up"], "down": ["KP_5", "KP_Begin"],
+     "fire": ["KP_0", "KP_Insert"], "shotgun": ["KP_Add"], "guard": ["KP_Enter"]},
+]
+COOP_HINTS = [
+    "P1 방향키  RCtrl  /  RShift",
+    "P2 WASD    LCtrl  Q  LShift",
+    "P3 숫자패드  0    +  Enter",
+]
+HUD_ROW = 80
+NET_ARENA = (800, 760)
+
+MAX_PLAYER_BULLETS = 120
+MAX_ENEMY_BULLETS = 400
+MAX_EFFECTS = 24
+
+STRESS_BULLET_CAP = 100000
+STRESS_BUDGET_MS = TICK_MS
+STRESS_WINDOW = 20
+STRESS_STEP_MS = 2000
+STRESS_WAVE = 4
+STRESS_RING = 24
+STRESS_HP = 10 ** 6
+
+IDLE_TICK_MS = 150
+BACKGROUND_TICK_MS = 500
+
+KIOSK_TITLE_MS = 3000
+KIOSK_RESTART_MS = 4000
+KIOSK_REPORT_SEC = 60
+
+SOAK_PLAY_MS = 2500
+SOAK_SETTLE_MS = 1500
+
 SHOTGUN_COST = 40
 SHOTGUN_ANGLES = [-20, -10, 0, 10, 20]
 
+AIM_FIXED = 0
+AIM_DIRECT = 1
+AIM_LEAD = 2
+
+ENEMY_PATTERNS = {
+    1: (AIM_DIRECT, [0]),
+    2: (AIM_FIXED, [-10, 0, 10]),
+    99: (AIM_LEAD, [-30, -15, 0, 15, 30]),
+}
+BOSS_PHASE2_PATTERN = (AIM_LEAD, [-45, -30, -15, 0, 15, 30, 45])
+
 IMG_DIR = "images"
 SOUND_DIR = "sounds"
 
@@ -46,6 +112,84 @@ def save_high_score(score):
     with open(SCORE_FILE, "w", encoding="utf-8") as f:
         f.write(str(score))
 
+def aim_angles(origins, modes, targets, vels, speed, vectorized=True):
+    if not origins:
+        return []
+
+    if vectorized and np is not None:
+        o = np.asarray(origins, dtype=float)
+        m = np.asarray(modes)
+        tg = np.asarray(targets, dtype=float)
+        v = np.asarray(vels, dtype=float)
+        dx = tg[:, 0] - o[:, 0]
+        dy = tg[:, 1] - o[:, 1]
+        vx = v[:, 0]
+        vy = v[:, 1]
+        a = vx * vx + vy * vy - speed * speed
+        b = 2 * (dx * vx + dy * vy)
+        c = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            disc = b * b - 4 * a * c
+            sq = np.sqrt(np.maximum(disc, 0.0))
+            t1 = (-b - sq) / (2 * a)
+            t2 = (-b + sq) / (2 * a)
+            tq = np.where(disc < 0, 0.0, np.where(t1 > 0, t1, np.where(t2 > 0, t2, 0.0)))
+            tl = np.where(b < 0, -c / b, 0.0)
+            t = np.where(np.abs(a) < 1e-9, tl, tq)
+        t = np.where(m == AIM_LEAD, np.nan_to_num(t), 0.0)
+        ang = np.arctan2(dx + vx * t, dy + vy * t)
+        return np.where(m == AIM_FIXED, 0.0, ang).tolist()
+
+    out = []
+    for (ox, oy), mode, (tx, ty), (vx, vy) in zip(origins, modes, targets, vels):
+        if mode == AIM_FIXED:
+            out.append(0.0)
+            continue
+        dx, dy = tx - ox, ty - oy
+        t = 0.0
+        if mode == AIM_LEAD:
+            a = vx * vx + vy * vy - speed * speed
+            b = 2 * (dx * vx + dy * vy)
+            c = dx * dx + dy * dy
+            if abs(a) < 1e-9:
+                t = -c / b if b < 0 else 0.0
+            else:
+                disc = b * b - 4 * a * c
+                if disc >= 0:
+                    sq = math.sqrt(disc)
+                    t1 = (-b - sq) / (2 * a)
+                    t2 = (-b + sq) / (2 * a)
+                    t = t1 if t1 > 0 else t2 if t2 > 0 else 0.0
+        out.append(math.atan2(dx + vx * t, dy + vy * t))
+    return out
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PMC(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (n, ctypes.c_size_t) for n in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+        try:
+            pmc = PMC()
+            pmc.cb = ctypes.sizeof(PMC)
+            proc = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(proc, ctypes.byref(pmc), pmc.cb):
+                return pmc.WorkingSetSize
+        except (OSError, AttributeError):
+            pass
+    return None
+
 def load_png(path):
     base = PhotoImage(file=path)
     scale = max(1, base.width() // TARGET)
@@ -75,6 +219,7 @@ class DeathEffect:
         self.idx = 0
         self.delay = delay
         self.item = canvas.create_image(x, y, image=frames[0])
+        self.job = None
         self.animate()
 
     def animate(self):
@@ -85,7 +230,7 @@ class DeathEffect:
             return
         self.canvas.itemconfig(self.item, image=self.frames[self.idx])
         self.idx += 1
-        self.canvas.after(self.delay, self.animate)
+        self.job = self.canvas.after(self.delay, self.animate)
 
 class Bullet:
     def __init__(self, canvas, x, y, img, vx, vy):
@@ -101,18 +246,19 @@ class Bullet:
         self.canvas.delete(self.item)
 
 class Enemy:
-    def __init__(self, canvas, x, y, frames, hp, speed, kind):
+    def __init__(self, canvas, x, y, frames, hp, speed, kind, rng=random):
         self.canvas = canvas
         self.frames = frames
         self.hp = hp
         self.max_hp = hp
         self.base_speed = speed
         self.speed = speed
-        self.dir = random.choice([-1, 1])
+        self.dir = rng.choice([-1, 1])
         self.kind = kind
         self.phase = 1
         self.item = canvas.create_image(x, y, image=frames[0])
         self.idx = 0
+        self.job = None
         self.animate()
 
     def animate(self):
@@ -120,7 +266,7 @@ class Enemy:
             return
         self.canvas.itemconfig(self.item, image=self.frames[self.idx])
         self.idx = (self.idx + 1) % len(self.frames)
-        self.canvas.after(160 if self.kind == 99 else 120, self.animate)
+        self.job = self.canvas.after(160 if self.kind == 99 else 120, self.animate)
 
     def move(self, cw, ch):
         if self.kind == 99 and self.phase == 1 and self.hp <= self.max_hp // 2:
@@ -143,27 +289,33 @@ class Enemy:
         self.canvas.coords(self.item, x, y)
 
 class Player:
-    def __init__(self, canvas, frames, guard_img, bullet_img):
+    def __init__(self, canvas, frames, guard_img, bullet_img, x=400, y=680, clock=None):
         self.canvas = canvas
         self.frames = frames
         self.guard_img = guard_img
         self.bullet_img = bullet_img
+        self.clock = clock
 
-        self.item = canvas.create_image(400, 680, image=frames[0])
+        self.item = canvas.create_image(x, y, image=frames[0])
+        self.vx = 0
+        self.vy = 0
         self.hp = MAX_HP
         self.alive = True
         self.invincible = False
-        self.last_shot = 0
+        self.last_shot = -SHOOT_DELAY
 
         self.guarding = False
         self.guard = GUARD_MAX
         self.guard_cd_until = 0
-        self.last_guard_tick = int(time.time() * 1000)
+        self.last_guard_tick = self.now()
 
         self.idx = 0
+        self.job = None
         self.animate()
 
     def now(self):
+        if self.clock:
+            return self.clock()
         return int(time.time() * 1000)
 
     def animate(self):
@@ -171,20 +323,23 @@ class Player:
             return
         if self.guarding:
             self.canvas.itemconfig(self.item, image=self.guard_img)
-            self.canvas.after(100, self.animate)
+            self.job = self.canvas.after(100, self.animate)
             return
         self.canvas.itemconfig(self.item, image=self.frames[self.idx])
         self.idx = (self.idx + 1) % len(self.frames)
-        self.canvas.after(100, self.animate)
+        self.job = self.canvas.after(100, self.animate)
 
     def move(self, dx, dy, cw, ch):
+        self.vx = self.vy = 0
         if not self.alive:
             return
-        self.canvas.move(self.item, dx, dy)
-        x, y = self.canvas.coords(self.item)
-        x = max(SPAWN_MARGIN, min(cw - SPAWN_MARGIN, x))
-        y = max(SPAWN_MARGIN, min(ch - SPAWN_MARGIN, y))
+        if dx == 0 and dy == 0:
+            return
+        x0, y0 = self.canvas.coords(self.item)
+        x = max(SPAWN_MARGIN, min(cw - SPAWN_MARGIN, x0 + dx))
+        y = max(SPAWN_MARGIN, min(ch - SPAWN_MARGIN, y0 + dy))
         self.canvas.coords(self.item, x, y)
+        self.vx, self.vy = x - x0, y - y0
 
     def shoot(self):
         if self.guarding:
@@ -249,44 +404,54 @@ class Player:
             self.guard_cd_until = self.now() + GUARD_BREAK_COOLDOWN
 
 class Game:
-    def __init__(self):
-        self.root = Tk()
-        self.root.title("SpaceShooting")
-        self.root.geometry("800x800")
+    def __init__(self, telemetry_path=None, audit=False, soak=0, kiosk=False, report_sec=KIOSK_REPORT_SEC, players=1,
+                 connect=None, headless=False, bot_names=(), seed=None, stress=False):
+        self.headless = headless
+        if headless:
+            self.root = HeadlessRoot()
+            self.canvas = HeadlessCanvas(self.root)
+        else:
+            self.root = Tk()
+            self.root.title("SpaceShooting")
+            self.root.geometry("800x800")
 
-        self.canvas = Canvas(self.root, bg="black")
-        self.canvas.pack(fill=BOTH, expand=True)
+            self.canvas = Canvas(self.root, bg="black")
+            self.canvas.pack(fill=BOTH, expand=True)
 
         self.root.bind("<KeyPress>", self.on_key)
         self.root.bind("<KeyRelease>", self.on_key_release)
         self.root.bind("<Configure>", self.on_resize)
         self.root.bind("<Return>", self.on_enter)
+        self.root.bind("<FocusIn>", self.on_focus)
+        self.root.bind("<FocusOut>", self.on_focus)
+        self.root.bind("<Map>", self.on_map)
+        self.root.bind("<Unmap>", self.on_map)
 
         self.audio_ok = False
         self.sfx_hit = None
         self.sfx_explode = None
         self.sfx_shotgun = None
-        self.init_audio()
+        if not headless:
+            self.init_audio()
 
         self.paused = False
         self.waiting_start = True
-        self.build_menu()
+        if not headless:
+            self.build_menu()
+
+        self.focused = True
+        self.minimized = False
+        self.auto_paused = False
+        self.idle = 0
+        self.loop_job = None
+        self.in_loop = False
 
         self.stars = []
-        self.star_count = 110
+        self.star_count = 0 if headless else 110
         self.blink_on = True
         self.last_blink = int(time.time() * 1000)
 
-        self.player_frames = load_gif(img("player.gif"))
-        self.player_guard_img = load_png(img("player2.png"))
-
-        self.enemy1_frames = load_gif(img("enemy1.gif"))
-        self.enemy2_frames = load_gif(img("enemy2.gif"))
-        self.boss_frames = load_gif(img("boss.gif"))
-        self.death_frames = load_gif(img("death.gif"), zoom=2)
-
-        self.bullet_player = load_png(img("attack(player).png"))
-        self.bullet_enemy = load_png(img("attack(enemy).png"))
+        self.load_assets()
 
         self.stage = 1
         self.score = 0
@@ -294,31 +459,98 @@ class Game:
         self.game_over = False
         self.stage_lock = True
 
-        self.shoot_job = None
+        self.sim_ms = 0
+        self.games = 0
+        self.fire_heap = []
+        self.fire_seq = 0
+        self.stage_lock_until = None
+        self.rng = random.Random(seed)
+
+        self.arena = None
+        self.net = netplay.NetClient(*connect) if connect else None
+        self.lockstep = None
+        self.net_latch = set()
+        self.guard_held = []
+        self.net_status = None
 
-        self.player = Player(self.canvas, self.player_frames, self.player_guard_img, self.bullet_player)
+        self.n_players = max(1, min(players, len(COOP_KEY_BINDINGS)))
+        self.build_bindings()
+
+        self.spawn_players()
         self.enemies = []
         self.player_bullets = []
         self.enemy_bullets = []
+        self.effects = []
 
         self.boss_hp_bar = None
         self.boss_hp_text = None
-        self.guard_bar = None
-        self.guard_text = None
 
-        self.ui = self.canvas.create_text(10, 10, anchor="nw", fill="white", font=("Consolas", 16))
-        self.hearts = self.canvas.create_text(10, 40, anchor="nw", fill="red", font=("Consolas", 22))
-        self.center = self.canvas.create_text(400, 400, fill="white", font=("Consolas", 32))
+        self.create_hud()
 
         self.keys = set()
 
+        self.telemetry = telemetry.TelemetryWriter(telemetry_path) if telemetry_path else None
+
+        self.audit = audit or soak > 0
+        self.image_names = self.build_image_names()
+        self.soak_restarts = soak
+        self.soak_snaps = []
+        self.exit_code = 0
+
+        self.kiosk = kiosk
+        self.report_ms = int(report_sec * 1000)
+        self.kiosk_started = time.time()
+
+        self.stress = stress
+        self.enemy_bullet_cap = STRESS_BULLET_CAP if stress else MAX_ENEMY_BULLETS
+        self.stress_level = 0
+        self.stress_next_ms = 0
+        self.stress_frames = deque(maxlen=STRESS_WINDOW)
+        self.stress_best = (0, 0.0)
+        self.stress_result = None
+
+        self.bots = {i: bots.make_bot(name) for i, name in enumerate(bot_names) if name}
+        if kiosk:
+            self.bots.setdefault(0, bots.DodgerBot())
+
         self.init_starfield()
         self.show_start_screen()
 
         self.loop()
+        if self.soak_restarts:
+            self.root.after(SOAK_SETTLE_MS, self.soak_baseline)
+        if self.kiosk:
+            self.root.attributes("-fullscreen", True)
+            self.root.after(KIOSK_TITLE_MS, self.kiosk_start)
+            self.root.after(self.report_ms, self.kiosk_report)
+        if headless:
+            return
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.mainloop()
 
+    def load_assets(self):
+        if self.headless:
+            self.player_frames = ["player"]
+            self.player_guard_img = "player_guard"
+            self.enemy1_frames = ["enemy1"]
+            self.enemy2_frames = ["enemy2"]
+            self.boss_frames = ["boss"]
+            self.death_frames = ["death#0", "death#1", "death#2", "death#3"]
+            self.bullet_player = "bullet_player"
+            self.bullet_enemy = "bullet_enemy"
+            return
+
+        self.player_frames = load_gif(img("player.gif"))
+        self.player_guard_img = load_png(img("player2.png"))
+
+        self.enemy1_frames = load_gif(img("enemy1.gif"))
+        self.enemy2_frames = load_gif(img("enemy2.gif"))
+        self.boss_frames = load_gif(img("boss.gif"))
+        self.death_frames = load_gif(img("death.gif"), zoom=2)
+
+        self.bullet_player = load_png(img("attack(player).png"))
+        self.bullet_enemy = load_png(img("attack(enemy).png"))
+
     def init_audio(self):
         try:
             pygame.mixer.init()
@@ -373,6 +605,10 @@ class Game:
             except: pass
 
     def on_close(self):
+        if self.net:
+            self.net.close()
+        if self.telemetry:
+            self.telemetry.close()
         try:
             if self.audio_ok:
                 pygame.mixer.music.stop()
@@ -441,25 +677,107 @@ class Game:
         self.root.geometry("800x800")
 
     def toggle_pause(self):
-        if self.game_over or self.waiting_start:
+        if self.game_over or self.waiting_start or self.lockstep:
             return
         self.paused = not self.paused
+        self.auto_paused = False
         if self.paused:
             self.music_pause()
             self.canvas.itemconfig(self.center, text="PAUSED\n(Press P to Resume)")
         else:
             self.music_unpause()
             self.canvas.itemconfig(self.center, text="")
+        self.wake()
 
     def resume(self):
-        if self.game_over or self.waiting_start:
+        if self.game_over or self.waiting_start or self.lockstep:
             return
         self.paused = False
+        self.auto_paused = False
         self.music_unpause()
         self.canvas.itemconfig(self.center, text="")
+        self.wake()
+
+    def on_focus(self, e):
+        self.root.after_idle(self.check_focus)
+
+    def check_focus(self):
+        try:
+            focused = self.root.focus_displayof() is not None
+        except:
+            focused = True
+        if focused == self.focused:
+            return
+        self.focused = focused
+        playing = not (self.waiting_start or self.game_over or self.paused)
+        if not focused and playing and not (self.bots or self.lockstep or self.stress):
+            self.toggle_pause()
+            self.auto_paused = True
+        elif focused and self.auto_paused and self.paused:
+            self.toggle_pause()
+        self.wake()
+
+    def on_map(self, e):
+        if e.widget is not self.root:
+            return
+        self.minimized = e.type == EventType.Unmap
+        self.wake()
+
+    def idle_level(self):
+        # 0 running, 1 title/game over, 2 frozen (paused or unfocused), 3 minimized
+        # a connected client must keep polling the relay and feeding its peers
+        if self.headless or self.net:
+            return 0
+        still = self.waiting_start or self.game_over
+        # bot, kiosk and stress games keep running unattended
+        if not still and (self.bots or self.stress) and not self.paused:
+            return 0
+        if self.minimized:
+            return 3
+        if self.paused or (still and not self.focused):
+            return 2
+        return 1 if still else 0
+
+    def tick_interval(self, elapsed=0.0):
+        level = self.idle_level()
+        if level == 0:
+            if self.headless:
+                return TICK_MS
+            # the frame's own work counts toward the period, so ticks stay TICK_MS apart
+            return max(1, TICK_MS - int(elapsed * 1000))
+        if level == 3:
+            return None
+        return IDLE_TICK_MS if self.focused else BACKGROUND_TICK_MS
+
+    def sync_idle(self):
+        level = self.idle_level()
+        held = []
+        if level >= 1:
+            held = self.players + self.enemies
+        if level >= 2:
+            held = held + self.effects
+        for obj in held:
+            if obj.job is not None:
+                self.canvas.after_cancel(obj.job)
+                obj.job = None
+        if level < self.idle:
+            for obj in self.players + self.enemies + self.effects:
+                if obj.job is None and obj not in held:
+                    obj.animate()
+        self.idle = level
+
+    def wake(self):
+        if self.in_loop or self.headless:
+            return
+        if self.loop_job is not None:
+            self.canvas.after_cancel(self.loop_job)
+        self.loop_job = self.canvas.after(1, self.loop)
+
+    def cw(self): return self.arena[0] if self.arena else max(1, self.canvas.winfo_width())
+    def ch(self): return self.arena[1] if self.arena else max(1, self.canvas.winfo_height())
 
-    def cw(self): return max(1, self.canvas.winfo_width())
-    def ch(self): return max(1, self.canvas.winfo_height())
+    def sim_clock(self):
+        return self.sim_ms
 
     def clear_starfield(self):
         for s in self.stars:
@@ -502,16 +820,23 @@ class Game:
         self.paused = False
         self.game_over = False
         self.stage_lock = True
-        self.canvas.itemconfig(
-            self.center,
-            text=(
-                "SpaceShooting\n\n"
-                "ENTER 키를 누르면 시작!\n\n"
-                "이동: 방향키   발사: Ctrl\n"
-                "샷건: Z        가드: Shift\n\n"
-                f"HIGH SCORE : {self.high}"
-            )
-        )
+        self.canvas.itemconfig(self.center, text=self.title_text(self.press_text()))
+
+    def press_text(self):
+        if self.net:
+            return self.net_status or "WAITING FOR PLAYERS..."
+        if self.net_status:
+            return f"{self.net_status}\nENTER 키를 누르면 시작!"
+        return "ENTER 키를 누르면 시작!"
+
+    def title_text(self, press):
+        if self.net:
+            return f"SpaceShooting ONLINE\n\n{press}\n\n{self.net.host}:{self.net.port}"
+        if self.n_players == 1:
+            controls = "이동: 방향키   발사: Ctrl\n샷건: Z        가드: Shift"
+        else:
+            controls = "\n".join(COOP_HINTS[:self.n_players])
+        return f"SpaceShooting\n\n{press}\n\n{controls}\n\nHIGH SCORE : {self.high}"
 
     def on_enter(self, event=None):
         if self.waiting_start:
@@ -519,41 +844,94 @@ class Game:
 
     def on_resize(self, e):
         self.init_starfield()
-        if self.player.alive and self.canvas.type(self.player.item) != "":
-            x, y = self.canvas.coords(self.player.item)
-            x = max(SPAWN_MARGIN, min(e.width - SPAWN_MARGIN, x))
-            y = max(SPAWN_MARGIN, min(e.height - SPAWN_MARGIN, y))
-            self.canvas.coords(self.player.item, x, y)
+        if self.arena:
+            return
+        for p in self.players:
+            if p.alive and self.canvas.type(p.item) != "":
+                x, y = self.canvas.coords(p.item)
+                x = max(SPAWN_MARGIN, min(e.width - SPAWN_MARGIN, x))
+                y = max(SPAWN_MARGIN, min(e.height - SPAWN_MARGIN, y))
+                self.canvas.coords(p.item, x, y)
 
     def clamp_x(self, x):
         return max(SPAWN_MARGIN, min(self.cw() - SPAWN_MARGIN, x))
 
-    def hit(self, a, b, ra, rb):
-        ax, ay = self.canvas.coords(a)
-        bx, by = self.canvas.coords(b)
-        ra *= TARGET
-        rb *= TARGET
-        return (ax - bx) ** 2 + (ay - by) ** 2 <= (ra + rb) ** 2
+    def hit(self, x, y, vx, vy, tx, ty, ra, rb):
+        r = (ra + rb) * TARGET
+        wx, wy = x - vx - tx, y - vy - ty
+        c = wx * wx + wy * wy - r * r
+        if c <= 0:
+            return 0.0
+        b = wx * vx + wy * vy
+        if b >= 0:
+            return None
+        a = vx * vx + vy * vy
+        disc = b * b - a * c
+        if disc < 0:
+            return None
+        t = (-b - math.sqrt(disc)) / a
+        return t if t <= 1.0 else None
+
+    def build_bindings(self):
+        bindings = KEY_BINDINGS if self.n_players == 1 or self.net else COOP_KEY_BINDINGS[:self.n_players]
+        self.move_keys = []
+        self.key_actions = {}
+        for i, bind in enumerate(bindings):
+            self.move_keys.append({d: {k.lower() for k in bind[d]} for d in ("left", "right", "up", "down")})
+            for action in ("fire", "shotgun", "guard"):
+                for k in bind[action]:
+                    self.key_actions[k.lower()] = (i, action)
+
+    def spawn_players(self):
+        n = self.n_players
+        cw = self.cw() if self.cw() > 1 else 800
+        self.players = []
+        for i in range(n):
+            x = 400 if n == 1 else cw * (i + 1) / (n + 1)
+            self.players.append(Player(self.canvas, self.player_frames, self.player_guard_img, self.bullet_player,
+                                       x, 680, clock=self.sim_clock))
+        self.player = self.players[0]
+        self.guard_held = [False] * n
+
+    def create_hud(self):
+        cx = self.cw() / 2 if self.cw() > 1 else 400
+        cy = self.ch() / 2 if self.ch() > 1 else 400
+        self.ui = self.canvas.create_text(10, 10, anchor="nw", fill="white", font=("Consolas", 16))
+        self.hearts = [
+            self.canvas.create_text(10, 40 + i * HUD_ROW, anchor="nw", fill="red", font=("Consolas", 22))
+            for i in range(self.n_players)
+        ]
+        self.guard_bars = [None] * self.n_players
+        self.guard_texts = [None] * self.n_players
+        self.center = self.canvas.create_text(cx, cy, fill="white", font=("Consolas", 32))
+
+    def draw_hud_text(self):
+        self.canvas.itemconfig(self.ui, text=f"STAGE:{self.stage} SCORE:{self.score} HIGH:{self.high}")
+        for i, p in enumerate(self.players):
+            label = f"P{i + 1} " if self.n_players > 1 else ""
+            self.canvas.itemconfig(self.hearts[i], text=label + "❤ " * max(0, p.hp))
 
     def start_game(self):
         if not self.waiting_start and not self.game_over:
             return
+        if self.net and not self.lockstep:
+            return
 
         self.waiting_start = False
         self.paused = False
         self.game_over = False
+        self.games += 1
         self.music_unpause()
+        self.wake()
+        if not self.net:
+            self.net_status = None
 
         self.stage = 1
         self.score = 0
         self.stage_lock = True
-
-        if self.shoot_job is not None:
-            try:
-                self.root.after_cancel(self.shoot_job)
-            except:
-                pass
-            self.shoot_job = None
+        self.stage_lock_until = None
+        self.sim_ms = 0
+        self.fire_heap = []
 
         self.canvas.delete("all")
         self.init_starfield()
@@ -561,22 +939,17 @@ class Game:
         self.enemies.clear()
         self.player_bullets.clear()
         self.enemy_bullets.clear()
+        self.effects.clear()
 
         self.boss_hp_bar = None
         self.boss_hp_text = None
-        self.guard_bar = None
-        self.guard_text = None
 
-        self.player = Player(self.canvas, self.player_frames, self.player_guard_img, self.bullet_player)
-
-        self.ui = self.canvas.create_text(10, 10, anchor="nw", fill="white", font=("Consolas", 16))
-        self.hearts = self.canvas.create_text(10, 40, anchor="nw", fill="red", font=("Consolas", 22))
-        self.center = self.canvas.create_text(self.cw() / 2, self.ch() / 2, fill="white", font=("Consolas", 32))
+        self.spawn_players()
+        self.create_hud()
         self.keys = set()
 
         self.canvas.itemconfig(self.center, text="")
         self.start_stage()
-        self.enemy_shoot_loop()
         self.stage_lock = False
 
     def start_stage(self):
@@ -592,6 +965,10 @@ class Game:
             self.canvas.delete(self.boss_hp_text)
             self.boss_hp_text = None
 
+        if self.stress:
+            self.start_stress()
+            return
+
         pattern = (self.stage - 1) % 3 + 1
         wave = (self.stage - 1) // 3
         count = 3 + wave
@@ -603,43 +980,48 @@ class Game:
         if pattern == 1:
             for i in range(count):
                 x = self.clamp_x(self.cw() * (i + 1) / (count + 1))
-                self.enemies.append(Enemy(self.canvas, x, 220, self.enemy1_frames, 1, 0, 1))
+                self.enemies.append(Enemy(self.canvas, x, 220, self.enemy1_frames, 1, 0, 1, self.rng))
 
         elif pattern == 2:
             for i in range(count):
                 x = self.clamp_x(self.cw() * (i + 1) / (count + 1))
                 if i % 2:
-                    self.enemies.append(Enemy(self.canvas, x, 220, self.enemy2_frames, 2, speed + 1, 2))
+                    self.enemies.append(Enemy(self.canvas, x, 220, self.enemy2_frames, 2, speed + 1, 2, self.rng))
                 else:
-                    self.enemies.append(Enemy(self.canvas, x, 220, self.enemy1_frames, 1, speed, 1))
+                    self.enemies.append(Enemy(self.canvas, x, 220, self.enemy1_frames, 1, speed, 1, self.rng))
 
         else:
             boss_hp = 6 + wave * 2
             boss_x = self.clamp_x(self.cw() / 2)
-            self.enemies.append(Enemy(self.canvas, boss_x, 160, self.boss_frames, boss_hp, 1 + wave, 99))
+            self.enemies.append(Enemy(self.canvas, boss_x, 160, self.boss_frames, boss_hp, 1 + wave, 99, self.rng))
 
             side_n = 2 + wave
             for i in range(side_n):
                 x = self.clamp_x(self.cw() * (i + 1) / (side_n + 1))
-                self.enemies.append(Enemy(self.canvas, x, 280, self.enemy2_frames, 2, speed + 1, 2))
+                self.enemies.append(Enemy(self.canvas, x, 280, self.enemy2_frames, 2, speed + 1, 2, self.rng))
+
+        self.reset_shooters()
+        if self.audit:
+            self.audit_report(f"stage {self.stage}")
 
     def draw_guard_ui(self):
-        if self.guard_bar:
-            self.canvas.delete(self.guard_bar)
-        if self.guard_text:
-            self.canvas.delete(self.guard_text)
-
-        ratio = max(0.0, min(1.0, self.player.guard / GUARD_MAX))
-        w = 180 * ratio
-        x1, y1 = 10, 74
-        x2, y2 = x1 + w, y1 + 14
-
-        fill = "cyan" if self.player.guard_cd_until <= self.player.now() else "gray"
-        self.guard_bar = self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="")
-        self.guard_text = self.canvas.create_text(
-            10, 92, anchor="nw", fill="white", font=("Consolas", 12),
-            text=f"GUARD: {int(self.player.guard)}"
-        )
+        for i, p in enumerate(self.players):
+            if self.guard_bars[i]:
+                self.canvas.delete(self.guard_bars[i])
+            if self.guard_texts[i]:
+                self.canvas.delete(self.guard_texts[i])
+
+            ratio = max(0.0, min(1.0, p.guard / GUARD_MAX))
+            w = 180 * ratio
+            x1, y1 = 10, 74 + i * HUD_ROW
+            x2, y2 = x1 + w, y1 + 14
+
+            fill = "cyan" if p.guard_cd_until <= p.now() else "gray"
+            self.guard_bars[i] = self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="")
+            self.guard_texts[i] = self.canvas.create_text(
+                10, 92 + i * HUD_ROW, anchor="nw", fill="white", font=("Consolas", 12),
+                text=f"GUARD: {int(p.guard)}"
+            )
 
     def draw_boss_hp_bar(self):
         boss = None
@@ -670,112 +1052,224 @@ class Game:
         )
 
     def on_key(self, e):
-        self.keys.add(e.keysym)
+        key = e.keysym.lower()
+        self.keys.add(key)
 
         if self.waiting_start:
             return
 
         if self.game_over:
-            if e.keysym.lower() == "r":
+            if key == "r":
                 self.restart_to_title()
             return
 
-        if e.keysym in ("Shift_L", "Shift_R"):
-            if not self.paused:
-                self.player.set_guard(True)
+        act = self.key_actions.get(key)
+        if act is None or self.paused:
             return
-
-        if e.keysym in ("Control_L", "Control_R"):
-            if not self.paused:
-                b = self.player.shoot()
-                if b:
-                    self.player_bullets.append(b)
+        if self.lockstep:
+            self.net_latch.add(act[1])
             return
+        p = self.players[act[0]]
+
+        if act[1] == "guard":
+            p.set_guard(True)
+
+        elif act[1] == "fire":
+            b = p.shoot()
+            if b:
+                self.add_bullets(self.player_bullets, [b], MAX_PLAYER_BULLETS)
 
-        if e.keysym.lower() == "z":
-            if not self.paused:
-                bullets = self.player.shoot_shotgun()
-                if bullets:
-                    self.play_shotgun()
-                    for b in bullets:
-                        self.player_bullets.append(b)
+        elif act[1] == "shotgun":
+            bullets = p.shoot_shotgun()
+            if bullets:
+                self.play_shotgun()
+                self.add_bullets(self.player_bullets, bullets, MAX_PLAYER_BULLETS)
 
     def on_key_release(self, e):
-        if e.keysym in self.keys:
-            self.keys.remove(e.keysym)
-        if e.keysym in ("Shift_L", "Shift_R"):
-            self.player.set_guard(False)
+        key = e.keysym.lower()
+        self.keys.discard(key)
+        act = self.key_actions.get(key)
+        if act and act[1] == "guard" and not self.lockstep:
+            self.players[act[0]].set_guard(False)
+
+    def key_intent(self, i):
+        m = self.move_keys[i]
+        k = self.keys
+        ix = (not m["right"].isdisjoint(k)) - (not m["left"].isdisjoint(k))
+        iy = (not m["down"].isdisjoint(k)) - (not m["up"].isdisjoint(k))
+        return ix, iy
+
+    def shooter_cooldown(self, en):
+        cooldown = ENEMY_BASE_COOLDOWN * ENEMY_COOLDOWN_SCALE.get(en.kind, 1.0) + (self.stage // 3) * 150
+        if en.kind == 99 and en.phase == 2:
+            cooldown = max(700, cooldown - 650)
+        return cooldown
+
+    def schedule_shot(self, en, at):
+        self.fire_seq += 1
+        heapq.heappush(self.fire_heap, (at, self.fire_seq, en))
+
+    def reset_shooters(self):
+        self.fire_heap = []
+        for en in self.enemies:
+            self.schedule_shot(en, self.sim_ms + self.rng.uniform(0.3, 1.0) * self.shooter_cooldown(en))
 
-    def enemy_shoot_loop(self):
-        if (self.waiting_start or self.paused) and not self.game_over:
-            self.shoot_job = self.root.after(120, self.enemy_shoot_loop)
-            return
-        if self.game_over:
+    def step_shooters(self):
+        due = []
+        while self.fire_heap and self.fire_heap[0][0] <= self.sim_ms:
+            at, _, en = heapq.heappop(self.fire_heap)
+            if en.hp <= 0 or self.canvas.type(en.item) == "":
+                continue
+            due.append(en)
+            self.schedule_shot(en, max(self.sim_ms, at + self.shooter_cooldown(en)))
+        if due:
+            self.fire_volley(due)
+
+    def enemy_pattern(self, en):
+        if self.stress:
+            return self.stress_pattern(en)
+        if en.kind == 99 and en.phase == 2:
+            return BOSS_PHASE2_PATTERN
+        return ENEMY_PATTERNS.get(en.kind, ENEMY_PATTERNS[1])
+
+    def fire_volley(self, shooters):
+        origins = []
+        patterns = []
+        for en in shooters:
+            if self.canvas.type(en.item) == "":
+                continue
+            sx, sy = self.canvas.coords(en.item)
+            origins.append((sx, sy + 50))
+            patterns.append(self.enemy_pattern(en))
+        if not origins:
             return
 
-        if self.enemies:
-            shooter = random.choice(self.enemies)
-            sx, sy = self.canvas.coords(shooter.item)
-
-            if shooter.kind == 99:
-                angles = [-45, -30, -15, 0, 15, 30, 45] if shooter.phase == 2 else [-30, -15, 0, 15, 30]
-                for a in angles:
-                    r = math.radians(a)
-                    self.enemy_bullets.append(Bullet(
-                        self.canvas, sx, sy + 50, self.bullet_enemy,
-                        math.sin(r) * BULLET_SPEED, math.cos(r) * BULLET_SPEED
-                    ))
-            elif shooter.kind == 2:
-                for a in [-10, 0, 10]:
-                    r = math.radians(a)
-                    self.enemy_bullets.append(Bullet(
-                        self.canvas, sx, sy + 50, self.bullet_enemy,
-                        math.sin(r) * BULLET_SPEED, math.cos(r) * BULLET_SPEED
-                    ))
-            else:
-                self.enemy_bullets.append(Bullet(self.canvas, sx, sy + 50, self.bullet_enemy, 0, BULLET_SPEED))
-
-        cooldown = ENEMY_BASE_COOLDOWN + (self.stage // 3) * 150
-        for en in self.enemies:
-            if en.kind == 99 and en.phase == 2:
-                cooldown = max(700, cooldown - 650)
-                break
-        self.shoot_job = self.root.after(cooldown, self.enemy_shoot_loop)
+        live = [(self.canvas.coords(p.item), (p.vx, p.vy)) for p in self.players
+                if p.alive and self.canvas.type(p.item) != ""]
+        if not live:
+            live = [((self.cw() / 2, self.ch()), (0, 0))]
+        targets = []
+        vels = []
+        for ox, oy in origins:
+            pos, vel = live[0] if len(live) == 1 else min(
+                live, key=lambda t: (t[0][0] - ox) ** 2 + (t[0][1] - oy) ** 2)
+            targets.append(pos)
+            vels.append(vel)
+        bases = aim_angles(origins, [p[0] for p in patterns], targets, vels, BULLET_SPEED,
+                           vectorized=self.lockstep is None)
 
-    def player_hit(self):
-        if not self.player.alive:
+        bullets = []
+        for (sx, sy), pat, base in zip(origins, patterns, bases):
+            speeds = pat[2] if len(pat) > 2 else (1.0,)
+            for a in pat[1]:
+                r = base + math.radians(a)
+                vx, vy = math.sin(r) * BULLET_SPEED, math.cos(r) * BULLET_SPEED
+                for m in speeds:
+                    bullets.append(Bullet(self.canvas, sx, sy, self.bullet_enemy, vx * m, vy * m))
+        self.add_bullets(self.enemy_bullets, bullets, self.enemy_bullet_cap)
+
+    def add_bullets(self, pool, bullets, cap):
+        pool.extend(bullets)
+        if len(pool) > cap:
+            drop = len(pool) - cap
+            for b in pool[:drop]:
+                b.delete()
+            del pool[:drop]
+
+    def spawn_effect(self, x, y, delay):
+        self.effects = [fx for fx in self.effects if self.canvas.type(fx.item) != ""]
+        if len(self.effects) >= MAX_EFFECTS:
+            self.canvas.delete(self.effects.pop(0).item)
+        self.effects.append(DeathEffect(self.canvas, x, y, self.death_frames, delay=delay))
+
+    def player_hit(self, p):
+        if not p.alive:
             return
 
-        if self.player.guarding and self.player.guard > 0 and self.player.now() >= self.player.guard_cd_until:
+        if p.guarding and p.guard > 0 and p.now() >= p.guard_cd_until:
             self.play_hit()
-            self.player.take_guard_hit(GUARD_HIT_COST)
+            p.take_guard_hit(GUARD_HIT_COST)
             return
 
-        if self.player.invincible:
+        if p.invincible:
             return
 
         self.play_hit()
-        self.player.hp -= 1
+        p.hp -= 1
+
+        if p.hp <= 0:
+            p.alive = False
+            if self.canvas.type(p.item) != "":
+                x, y = self.canvas.coords(p.item)
+                self.canvas.delete(p.item)
+                self.spawn_effect(x, y, 90)
+                self.play_explode()
 
-        if self.player.hp <= 0:
+            if any(q.alive for q in self.players):
+                return
             self.game_over = True
-            self.player.alive = False
-            if self.canvas.type(self.player.item) != "":
-                x, y = self.canvas.coords(self.player.item)
-                self.canvas.delete(self.player.item)
-                DeathEffect(self.canvas, x, y, self.death_frames, delay=90)
-                self.play_explode()
 
-            if self.score > self.high:
+            if self.score > self.high and not self.bots and not self.headless:
                 self.high = self.score
                 save_high_score(self.high)
 
+            if self.kiosk:
+                self.root.after(KIOSK_RESTART_MS, self.kiosk_restart)
+
             self.canvas.itemconfig(
                 self.center,
                 text=f"GAME OVER\n\nR 키를 눌러 타이틀로\n\nSCORE : {self.score}\nHIGH : {self.high}"
             )
 
     def loop(self):
+        self.loop_job = None
+        self.in_loop = True
+        t0 = time.perf_counter()
+        self.tick()
+        if self.stress:
+            self.root.update_idletasks()
+        frame_s = time.perf_counter() - t0
+        if self.telemetry:
+            self.record_telemetry(frame_s)
+        if self.stress and not (self.waiting_start or self.game_over or self.paused):
+            self.stress_sample(frame_s)
+        self.in_loop = False
+        self.sync_idle()
+        ms = self.tick_interval(time.perf_counter() - t0)
+        if ms is not None:
+            self.loop_job = self.canvas.after(ms, self.loop)
+
+    def record_telemetry(self, frame_s):
+        flags = 0
+        if self.paused: flags |= telemetry.FLAG_PAUSED
+        if self.waiting_start: flags |= telemetry.FLAG_TITLE
+        if self.game_over: flags |= telemetry.FLAG_GAME_OVER
+
+        boss_hp = -1
+        for en in self.enemies:
+            if en.kind == 99:
+                flags |= telemetry.FLAG_BOSS
+                boss_hp = en.hp
+                break
+
+        frame_us = int(frame_s * 1_000_000)
+        counts = (len(self.enemies), len(self.player_bullets), len(self.enemy_bullets), boss_hp)
+        for slot, p in enumerate(self.players):
+            pflags = flags
+            if p.guarding: pflags |= telemetry.FLAG_GUARDING
+            if p.guard_cd_until > p.now(): pflags |= telemetry.FLAG_GUARD_BROKEN
+
+            x = y = -1.0
+            if p.alive and self.canvas.type(p.item) != "":
+                x, y = self.canvas.coords(p.item)
+
+            self.telemetry.sample((
+                self.sim_ms, self.games, slot, frame_us, self.stage, self.score, x, y, p.hp, p.guard, pflags
+            ) + counts)
+
+    def tick(self):
+        if self.net:
+            self.net_poll()
         self.update_starfield()
 
         if self.waiting_start:
@@ -783,98 +1277,308 @@ class Game:
             if now - self.last_blink >= 450:
                 self.last_blink = now
                 self.blink_on = not self.blink_on
-                press = "ENTER 키를 누르면 시작!" if self.blink_on else " "
-                self.canvas.itemconfig(
-                    self.center,
-                    text=(
-                        "SpaceShooting\n\n"
-                        f"{press}\n\n"
-                        "이동: 방향키   발사: Ctrl\n"
-                        "샷건: Z        가드: Shift\n\n"
-                        f"HIGH SCORE : {self.high}"
-                    )
-                )
-            self.canvas.itemconfig(self.ui, text=f"STAGE:{self.stage} SCORE:{self.score} HIGH:{self.high}")
-            self.canvas.itemconfig(self.hearts, text="❤ " * max(0, self.player.hp))
-            self.canvas.after(30, self.loop)
+                press = self.press_text() if self.blink_on else " "
+                self.canvas.itemconfig(self.center, text=self.title_text(press))
+            self.draw_hud_text()
             return
 
         if not self.game_over:
             if self.paused:
                 self.draw_boss_hp_bar()
                 self.draw_guard_ui()
-                self.canvas.itemconfig(self.ui, text=f"STAGE:{self.stage} SCORE:{self.score} HIGH:{self.high}")
-                self.canvas.itemconfig(self.hearts, text="❤ " * max(0, self.player.hp))
-                self.canvas.after(30, self.loop)
+                self.draw_hud_text()
                 return
 
             cw, ch = self.cw(), self.ch()
 
-            dx = 0
-            dy = 0
-            if "Left" in self.keys: dx -= PLAYER_SPEED
-            if "Right" in self.keys: dx += PLAYER_SPEED
-            if "Up" in self.keys: dy -= PLAYER_SPEED
-            if "Down" in self.keys: dy += PLAYER_SPEED
-            if dx != 0 or dy != 0:
+            if self.lockstep:
+                inputs = self.lockstep.ready()
+                if inputs is None:
+                    self.draw_guard_ui()
+                    self.draw_hud_text()
+                    return
+                ls = self.lockstep
+                bits = self.local_bits()
+                self.net.send_input(ls.slot, ls.frame + ls.delay, bits)
+                ls.add(ls.slot, ls.frame + ls.delay, bits)
+                ls.advance()
+                self.net_latch.clear()
+                intents = self.apply_net_inputs(inputs)
+            else:
+                intents = [self.key_intent(i) for i in range(self.n_players)]
+            if self.bots and not self.lockstep:
+                world = self.snapshot()
+                for i, bot in self.bots.items():
+                    if i < self.n_players:
+                        intents[i] = self.apply_action(i, bot.act(world, i))
+
+            if self.stage_lock_until is not None and self.sim_ms >= self.stage_lock_until:
+                self.stage_lock = False
+                self.stage_lock_until = None
+
+            for p, (ix, iy) in zip(self.players, intents):
+                dx = ix * PLAYER_SPEED
+                dy = iy * PLAYER_SPEED
                 if dx != 0 and dy != 0:
-                    s = PLAYER_SPEED / (2 ** 0.5)
-                    dx = s if dx > 0 else -s
-                    dy = s if dy > 0 else -s
-                self.player.move(dx, dy, cw, ch)
+                    dx *= 2 ** -0.5
+                    dy *= 2 ** -0.5
+                p.move(dx, dy, cw, ch)
+                p.regen_guard()
 
-            self.player.regen_guard()
+            self.sim_ms += TICK_MS
 
             for en in self.enemies:
                 en.move(cw, ch)
 
-            for b in self.player_bullets[:]:
-                b.move()
-                x, y = b.pos()
-                if y < -50 or x < -50 or x > cw + 50:
-                    b.delete(); self.player_bullets.remove(b); continue
-                for en in self.enemies[:]:
-                    if self.hit(b.item, en.item, 0.25, ENEMY_HIT):
-                        en.hp -= 1
-                        b.delete(); self.player_bullets.remove(b)
-                        if en.hp <= 0:
-                            ex, ey = self.canvas.coords(en.item)
-                            self.canvas.delete(en.item)
-                            self.enemies.remove(en)
-                            DeathEffect(self.canvas, ex, ey, self.death_frames, delay=80)
-                            self.play_explode()
-                            self.score += 1000 if en.kind == 99 else 200 if en.kind == 2 else 100
-                        break
-
-            for b in self.enemy_bullets[:]:
-                b.move()
-                x, y = b.pos()
-                if y > ch + 50 or x < -50 or x > cw + 50:
-                    b.delete(); self.enemy_bullets.remove(b); continue
-                if self.player.alive and self.hit(b.item, self.player.item, ENEMY_HIT, PLAYER_HIT):
-                    b.delete(); self.enemy_bullets.remove(b)
-                    self.player_hit()
-
-            if not self.enemies and not self.stage_lock:
+            self.step_shooters()
+            self.update_bullets(cw, ch)
+
+            if self.stress and self.sim_ms >= self.stress_next_ms:
+                self.stress_step()
+
+            if not self.enemies and not self.stage_lock and not self.stress:
                 self.stage_lock = True
                 self.score += 500
                 self.stage += 1
                 self.start_stage()
-                self.root.after(220, lambda: setattr(self, "stage_lock", False))
+                self.stage_lock_until = self.sim_ms + 220
 
         self.draw_boss_hp_bar()
         self.draw_guard_ui()
-        self.canvas.itemconfig(self.ui, text=f"STAGE:{self.stage} SCORE:{self.score} HIGH:{self.high}")
-        self.canvas.itemconfig(self.hearts, text="❤ " * max(0, self.player.hp))
-        self.canvas.after(30, self.loop)
+        self.draw_hud_text()
+
+    def update_bullets(self, cw, ch):
+        targets = [(en, *self.canvas.coords(en.item)) for en in self.enemies]
+        kept = []
+        for b in self.player_bullets:
+            b.move()
+            x, y = b.pos()
+            if y < -50 or x < -50 or x > cw + 50:
+                b.delete(); continue
+            first = None
+            first_t = 2.0
+            for tgt in targets:
+                if tgt[0].hp > 0:
+                    t = self.hit(x, y, b.vx, b.vy, tgt[1], tgt[2], 0.25, ENEMY_HIT)
+                    if t is not None and t < first_t:
+                        first, first_t = tgt, t
+            if first is None:
+                kept.append(b)
+                continue
+            en, ex, ey = first
+            en.hp -= 1
+            b.delete()
+            if en.hp <= 0:
+                self.canvas.delete(en.item)
+                self.spawn_effect(ex, ey, 80)
+                self.play_explode()
+                self.score += 1000 if en.kind == 99 else 200 if en.kind == 2 else 100
+        self.player_bullets[:] = kept
+        if len(targets) != len(self.enemies) or any(en.hp <= 0 for en in self.enemies):
+            self.enemies[:] = [en for en in self.enemies if en.hp > 0]
+
+        players = [(p, *self.canvas.coords(p.item)) for p in self.players
+                   if p.alive and self.canvas.type(p.item) != ""]
+        kept = []
+        for b in self.enemy_bullets:
+            b.move()
+            x, y = b.pos()
+            if y > ch + 50 or y < -50 or x < -50 or x > cw + 50:
+                b.delete(); continue
+            first = None
+            first_t = 2.0
+            for p, px, py in players:
+                if p.alive:
+                    t = self.hit(x, y, b.vx, b.vy, px, py, ENEMY_HIT, PLAYER_HIT)
+                    if t is not None and t < first_t:
+                        first, first_t = p, t
+            if first is None:
+                kept.append(b)
+                continue
+            b.delete()
+            self.player_hit(first)
+        self.enemy_bullets[:] = kept
+
+    def start_stress(self):
+        self.stress_level = 0
+        self.stress_frames.clear()
+        self.stress_best = (0, 0.0)
+        self.stress_result = None
+        for p in self.players:
+            p.invincible = True
+        self.fire_heap = []
+        self.stress_step()
+
+    def stress_step(self):
+        self.stress_level += 1
+        self.stress_next_ms = self.sim_ms + STRESS_STEP_MS
+        level = self.stress_level
+        cw = self.cw()
+
+        wave = []
+        y = 140 + 40 * (level % 6)
+        for i in range(STRESS_WAVE):
+            x = self.clamp_x(cw * (i + 1) / (STRESS_WAVE + 1))
+            if i % 2:
+                wave.append(Enemy(self.canvas, x, y, self.enemy2_frames, STRESS_HP, 3, 2, self.rng))
+            else:
+                wave.append(Enemy(self.canvas, x, y, self.enemy1_frames, STRESS_HP, 2, 1, self.rng))
+        if level % 2 == 0:
+            boss = Enemy(self.canvas, self.clamp_x(cw / 2), 160, self.boss_frames, STRESS_HP, 1, 99, self.rng)
+            boss.phase = 2
+            boss.speed = boss.base_speed + 2
+            wave.append(boss)
+
+        for en in wave:
+            self.enemies.append(en)
+            self.schedule_shot(en, self.sim_ms + self.rng.uniform(0.1, 1.0) * self.shooter_cooldown(en))
+
+        if self.frame_avg_ms() is not None:
+            print(f"[stress] level {level}: enemies={len(self.enemies)} bullets={len(self.enemy_bullets)} "
+                  f"frame={self.frame_avg_ms():.2f}ms", flush=True)
+
+    def stress_pattern(self, en):
+        k = self.stress_level // 3
+        if en.kind == 99:
+            step = 360 / STRESS_RING
+            rings = tuple(max(0.4, 1.0 - 0.15 * r) for r in range(1 + self.stress_level // 2))
+            return (AIM_FIXED, [i * step for i in range(STRESS_RING)], rings)
+        mode, offsets = ENEMY_PATTERNS.get(en.kind, ENEMY_PATTERNS[1])
+        n = len(offsets) + 2 * k
+        half = (max(offsets) - min(offsets)) / 2 + 8 * k
+        if n == 1:
+            return (mode, [0])
+        return (mode, [-half + 2 * half * i / (n - 1) for i in range(n)])
+
+    def frame_avg_ms(self):
+        if not self.stress_frames:
+            return None
+        return 1000 * sum(self.stress_frames) / len(self.stress_frames)
+
+    def stress_sample(self, frame_s):
+        self.stress_frames.append(frame_s)
+        if len(self.stress_frames) < STRESS_WINDOW:
+            return
+        avg = self.frame_avg_ms()
+        bullets = len(self.enemy_bullets) + len(self.player_bullets)
+        if avg <= STRESS_BUDGET_MS:
+            if bullets > self.stress_best[0]:
+                self.stress_best = (bullets, avg)
+            return
+
+        best, best_ms = self.stress_best
+        self.stress_result = (best, best_ms, self.stress_level)
+        self.game_over = True
+        msg = (f"budget {STRESS_BUDGET_MS}ms exceeded at level {self.stress_level} "
+               f"({bullets} bullets, {avg:.1f}ms); max sustainable bullets: {best} ({best_ms:.1f}ms)")
+        print(f"[stress] {msg}", flush=True)
+        self.canvas.itemconfig(self.center, text=f"STRESS DONE\n\nMAX BULLETS : {best}\n({best_ms:.1f} ms/frame)")
+
+    def net_poll(self):
+        for ev in self.net.poll():
+            if ev[0] == "start" and self.waiting_start:
+                _, n, slot, seed = ev
+                self.n_players = n
+                self.arena = NET_ARENA
+                self.rng.seed(seed)
+                self.build_bindings()
+                self.lockstep = netplay.Lockstep(n, slot)
+                self.start_game()
+            elif ev[0] == "input" and self.lockstep:
+                self.lockstep.add(ev[1], ev[2], ev[3])
+            elif ev[0] == "bye" and self.lockstep:
+                self.lockstep.drop(ev[1])
+            elif ev[0] == "closed":
+                if self.lockstep and not self.game_over:
+                    for s in range(self.n_players):
+                        if s != self.lockstep.slot:
+                            self.lockstep.drop(s)
+                self.net_status = f"OFFLINE ({ev[1]})"
+                if self.waiting_start:
+                    self.net = None
+                    self.canvas.itemconfig(self.center, text=self.title_text(self.press_text()))
+                elif not self.game_over:
+                    self.canvas.itemconfig(self.center, text=self.net_status)
+
+    def local_bits(self):
+        ix, iy = self.key_intent(0)
+        bits = 0
+        if ix < 0: bits |= netplay.IN_LEFT
+        if ix > 0: bits |= netplay.IN_RIGHT
+        if iy < 0: bits |= netplay.IN_UP
+        if iy > 0: bits |= netplay.IN_DOWN
+        if "fire" in self.net_latch: bits |= netplay.IN_FIRE
+        if "shotgun" in self.net_latch: bits |= netplay.IN_SHOTGUN
+        if any(self.key_actions.get(k, (0, ""))[1] == "guard" for k in self.keys): bits |= netplay.IN_GUARD
+        return bits
+
+    def apply_net_inputs(self, inputs):
+        intents = []
+        for i, bits in enumerate(inputs):
+            intents.append(self.apply_action(i, bots.Action(
+                bool(bits & netplay.IN_RIGHT) - bool(bits & netplay.IN_LEFT),
+                bool(bits & netplay.IN_DOWN) - bool(bits & netplay.IN_UP),
+                bool(bits & netplay.IN_FIRE),
+                bool(bits & netplay.IN_SHOTGUN),
+                bool(bits & netplay.IN_GUARD),
+            )))
+        return intents
+
+    def apply_action(self, i, act):
+        p = self.players[i]
+        if act.guard != self.guard_held[i]:
+            self.guard_held[i] = act.guard
+            p.set_guard(act.guard)
+        if act.fire:
+            b = p.shoot()
+            if b:
+                self.add_bullets(self.player_bullets, [b], MAX_PLAYER_BULLETS)
+        if act.shotgun:
+            bullets = p.shoot_shotgun()
+            if bullets:
+                self.play_shotgun()
+                self.add_bullets(self.player_bullets, bullets, MAX_PLAYER_BULLETS)
+        return max(-1, min(1, act.move_x)), max(-1, min(1, act.move_y))
+
+    def snapshot(self):
+        c = self.canvas
+        players = []
+        for i, p in enumerate(self.players):
+            x, y = c.coords(p.item) if p.alive and c.type(p.item) != "" else (-1.0, -1.0)
+            players.append(bots.PlayerView(i, x, y, p.vx, p.vy, p.hp, p.guard, p.guarding,
+                                           p.now() >= p.guard_cd_until, p.alive))
+        enemies = tuple(bots.EnemyView(*c.coords(en.item), en.hp, en.kind, en.phase) for en in self.enemies)
+        pb = tuple(bots.BulletView(*c.coords(b.item), b.vx, b.vy) for b in self.player_bullets)
+        eb = tuple(bots.BulletView(*c.coords(b.item), b.vx, b.vy) for b in self.enemy_bullets)
+        return bots.World(self.sim_ms, self.cw(), self.ch(), self.stage, self.score,
+                          (ENEMY_HIT + PLAYER_HIT) * TARGET, tuple(players), enemies, pb, eb)
+
+    def run_headless(self, ticks):
+        results = []
+        auto = not self.soak_restarts
+        for _ in range(ticks):
+            if self.waiting_start and auto:
+                self.start_game()
+            elif self.stress_result:
+                break
+            elif self.game_over and auto:
+                results.append((self.stage, self.score, self.sim_ms))
+                self.restart_to_title()
+                self.start_game()
+            self.root.advance(TICK_MS)
+            if self.root.destroyed:
+                break
+        return results
 
     def restart_to_title(self):
-        if self.shoot_job is not None:
-            try:
-                self.root.after_cancel(self.shoot_job)
-            except:
-                pass
-            self.shoot_job = None
+        if self.lockstep:
+            self.net.close()
+            self.net = None
+            self.lockstep = None
+            self.arena = None
+            self.n_players = 1
+            self.build_bindings()
+        self.fire_heap = []
 
         self.canvas.delete("all")
         self.init_starfield()
@@ -882,25 +1586,172 @@ class Game:
         self.enemies.clear()
         self.player_bullets.clear()
         self.enemy_bullets.clear()
+        self.effects.clear()
 
         self.boss_hp_bar = None
         self.boss_hp_text = None
-        self.guard_bar = None
-        self.guard_text = None
 
         self.stage = 1
         self.score = 0
         self.game_over = False
         self.paused = False
 
-        self.player = Player(self.canvas, self.player_frames, self.player_guard_img, self.bullet_player)
-
-        self.ui = self.canvas.create_text(10, 10, anchor="nw", fill="white", font=("Consolas", 16))
-        self.hearts = self.canvas.create_text(10, 40, anchor="nw", fill="red", font=("Consolas", 22))
-        self.center = self.canvas.create_text(self.cw() / 2, self.ch() / 2, fill="white", font=("Consolas", 32))
+        self.spawn_players()
+        self.create_hud()
         self.keys = set()
 
         self.show_start_screen()
+        self.sync_idle()
+        if self.audit:
+            self.audit_report("restart")
+        if self.kiosk:
+            self.root.after(KIOSK_TITLE_MS, self.kiosk_start)
 
-Game()
+    def kiosk_start(self):
+        if self.waiting_start:
+            self.start_game()
+
+    def kiosk_restart(self):
+        if self.game_over:
+            self.restart_to_title()
+
+    def kiosk_report(self):
+        snap = self.audit_snapshot()
+        items = sum(v for k, v in snap.items() if k.startswith("item:"))
+        afters = sum(v for k, v in snap.items() if k.startswith("after:"))
+
+        tracked = (Bullet, Enemy, Player, DeathEffect)
+        counts = dict.fromkeys((t.__name__ for t in tracked), 0)
+        objs = gc.get_objects()
+        for o in objs:
+            if isinstance(o, tracked):
+                counts[type(o).__name__] += 1
+
+        rss = rss_bytes()
+        rss_txt = f"{rss / (1024 * 1024):.1f}MB" if rss is not None else "n/a"
+        uptime = int(time.time() - self.kiosk_started)
+        detail = " ".join(f"{k}={v}" for k, v in counts.items())
+        print(f"[kiosk] up={uptime}s rss={rss_txt} items={items} afters={afters} "
+              f"tcl_commands={snap['tcl_commands']} py_objects={len(objs)} {detail}", flush=True)
+        self.root.after(self.report_ms, self.kiosk_report)
+
+    def build_image_names(self):
+        names = {}
+        groups = [
+            ("player", self.player_frames), ("player_guard", [self.player_guard_img]),
+            ("enemy1", self.enemy1_frames), ("enemy2", self.enemy2_frames),
+            ("boss", self.boss_frames), ("death", self.death_frames),
+            ("bullet_player", [self.bullet_player]), ("bullet_enemy", [self.bullet_enemy]),
+        ]
+        for cat, frames in groups:
+            for f in frames:
+                names[str(f)] = cat
+        return names
+
+    def audit_snapshot(self):
+        counts = {}
+        for item in self.canvas.find_all():
+            cat = self.canvas.type(item)
+            if cat == "image":
+                cat = self.image_names.get(self.canvas.itemcget(item, "image"), "image")
+            counts["item:" + cat] = counts.get("item:" + cat, 0) + 1
+
+        if self.headless:
+            for name in self.root.pending_names():
+                counts["after:" + name] = counts.get("after:" + name, 0) + 1
+            counts["tcl_commands"] = 0
+            return counts
+
+        tk = self.root.tk
+        for aid in tk.splitlist(tk.call("after", "info")):
+            try:
+                script = tk.splitlist(tk.call("after", "info", aid))[0]
+            except TclError:
+                continue
+            cat = "after:" + str(script).lstrip("0123456789")
+            counts[cat] = counts.get(cat, 0) + 1
+
+        counts["tcl_commands"] = len(self.root._tclCommands or []) + len(self.canvas._tclCommands or [])
+        return counts
+
+    def audit_report(self, label):
+        snap = self.audit_snapshot()
+        items = sum(v for k, v in snap.items() if k.startswith("item:"))
+        afters = sum(v for k, v in snap.items() if k.startswith("after:"))
+        detail = " ".join(f"{k}={v}" for k, v in sorted(snap.items()))
+        print(f"[audit] {label}: items={items} afters={afters} {detail}", flush=True)
+        return snap
+
+    def soak_baseline(self):
+        self.soak_snaps.append(self.audit_report("soak baseline"))
+        self.soak_cycle()
+
+    def soak_cycle(self):
+        self.start_game()
+        self.root.after(500, self.show_controls)
+        self.root.after(1000, self.soak_clear_stage)
+        self.root.after(SOAK_PLAY_MS, self.restart_to_title)
+        self.root.after(SOAK_PLAY_MS + SOAK_SETTLE_MS, self.soak_check)
+
+    def soak_clear_stage(self):
+        for en in self.enemies:
+            self.canvas.delete(en.item)
+        self.enemies.clear()
+
+    def soak_check(self):
+        self.soak_snaps.append(self.audit_report(f"soak {len(self.soak_snaps)}/{self.soak_restarts}"))
+        if len(self.soak_snaps) <= self.soak_restarts:
+            self.soak_cycle()
+            return
+
+        # the settled title screen should look the same after every restart
+        grown = {}
+        for k in set().union(*self.soak_snaps):
+            counts = [snap.get(k, 0) for snap in self.soak_snaps]
+            if counts[-1] > counts[0]:
+                grown[k] = counts
+        if grown:
+            self.exit_code = 1
+            for k, counts in sorted(grown.items()):
+                print(f"[audit] LEAK {k}: {' -> '.join(map(str, counts))}", flush=True)
+        else:
+            print(f"[audit] soak OK after {self.soak_restarts} restarts", flush=True)
+        self.on_close()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="SpaceShooting")
+    ap.add_argument("--telemetry", metavar="PATH", help="record per-tick session telemetry to PATH")
+    ap.add_argument("--audit", action="store_true", help="report live canvas items and after callbacks per stage/restart")
+    ap.add_argument("--soak", type=int, default=0, metavar="N", help="run N automatic restarts and fail if items/callbacks grow")
+    ap.add_argument("--players", type=int, default=1, metavar="N", help="local co-op with N players (up to 3)")
+    ap.add_argument("--connect", metavar="HOST:PORT", help="online co-op through a netplay relay")
+    ap.add_argument("--bot", action="append", default=[], choices=list(bots.POLICIES),
+                    help="drive the next player slot with a bot")
+    ap.add_argument("--headless", action="store_true", help="run without a window as fast as possible")
+    ap.add_argument("--ticks", type=int, default=10000, help="ticks to simulate in headless mode")
+    ap.add_argument("--seed", type=int, help="seed for the simulation RNG")
+    ap.add_argument("--stress", action="store_true", help="ramp bullet density until frame time exceeds the tick budget")
+    ap.add_argument("--kiosk", action="store_true", help="unattended attract mode with automatic restarts")
+    ap.add_argument("--report-sec", type=float, default=KIOSK_REPORT_SEC, metavar="SEC", help="kiosk self-report interval")
+    args = ap.parse_args()
+    if len(args.bot) > len(COOP_KEY_BINDINGS):
+        ap.error(f"at most {len(COOP_KEY_BINDINGS)} players, got {len(args.bot)} --bot options")
+    connect = None
+    if args.connect:
+        host, _, port = args.connect.partition(":")
+        connect = (host or "127.0.0.1", int(port or netplay.DEFAULT_PORT))
+    game = Game(telemetry_path=args.telemetry, audit=args.audit, soak=args.soak, kiosk=args.kiosk, report_sec=args.report_sec,
+                players=max(args.players, len(args.bot)), connect=connect, headless=args.headless, bot_names=args.bot, seed=args.seed,
+                stress=args.stress)
+    if args.headless:
+        t0 = time.perf_counter()
+        results = game.run_headless(args.ticks)
+        dt = time.perf_counter() - t0
+        for i, (stage, score, ms) in enumerate(results, 1):
+            print(f"[headless] game {i}: stage={stage} score={score} time={ms / 1000:.1f}s")
+        ticks = game.root.clock // TICK_MS
+        print(f"[headless] {ticks} ticks in {dt:.2f}s ({ticks / dt:.0f} ticks/s), "
+              f"stage={game.stage} score={game.score} games_over={len(results)}")
+        game.on_close()
+    sys.exit(game.exit_code)
 
@@ -0,0 +1,98 @@
+"""Scripted players.
+
+Each tick the game hands every bot a read-only World snapshot and the slot
+it controls; the bot returns an Action. Positions are canvas pixels and
+velocities are pixels per tick.
+"""
+from collections import namedtuple
+
+World = namedtuple("World", "sim_ms width height stage score hit_radius players enemies player_bullets enemy_bullets")
+PlayerView = namedtuple("PlayerView", "slot x y vx vy hp guard guarding guard_ready alive")
+EnemyView = namedtuple("EnemyView", "x y hp kind phase")
+BulletView = namedtuple("BulletView", "x y vx vy")
+
+Action = namedtuple("Action", "move_x move_y fire shotgun guard")
+IDLE = Action(0, 0, False, False, False)
+
+def closest_approach(me, b):
+    rx, ry = b.x - me.x, b.y - me.y
+    vv = b.vx * b.vx + b.vy * b.vy
+    t = -(rx * b.vx + ry * b.vy) / vv if vv else 0.0
+    return t, rx + b.vx * t, ry + b.vy * t
+
+class Bot:
+    def act(self, world, slot):
+        return IDLE
+
+class DodgerBot(Bot):
+    def __init__(self, lookahead=24, margin=1.4, guard_cost=35):
+        self.lookahead = lookahead
+        self.margin = margin
+        self.guard_cost = guard_cost
+
+    def act(self, world, slot):
+        me = world.players[slot]
+        if not me.alive:
+            return IDLE
+
+        danger = world.hit_radius * self.margin
+        threat = None
+        threat_t = self.lookahead
+        for b in world.enemy_bullets:
+            t, cx, cy = closest_approach(me, b)
+            if 0 <= t < threat_t and cx * cx + cy * cy < danger * danger:
+                threat_t, threat = t, cx
+
+        mx = 0
+        if threat is not None:
+            mx = -1 if threat > 0 else 1
+            if (mx < 0 and me.x < 80) or (mx > 0 and me.x > world.width - 80):
+                mx = -mx
+        elif world.enemies:
+            tx = min((en.x for en in world.enemies), key=lambda x: abs(x - me.x))
+            if tx < me.x - 8: mx = -1
+            elif tx > me.x + 8: mx = 1
+        my = 1 if me.y < world.height - 120 else 0
+
+        guard = threat is not None and threat_t < 6 and me.guard_ready and me.guard > self.guard_cost
+        return Action(mx, my, True, False, guard)
+
+class GreedyShooterBot(Bot):
+    SCORE = {1: 100, 2: 200, 99: 1000}
+
+    def __init__(self, shotgun_range=260, shotgun_cost=40):
+        self.shotgun_range = shotgun_range
+        self.shotgun_cost = shotgun_cost
+
+    def act(self, world, slot):
+        me = world.players[slot]
+        if not me.alive:
+            return IDLE
+        if not world.enemies:
+            return Action(0, 0, True, False, False)
+
+        target = max(world.enemies, key=lambda en: (self.SCORE.get(en.kind, 100) / en.hp, -abs(en.x - me.x)))
+        mx = -1 if target.x < me.x - 6 else 1 if target.x > me.x + 6 else 0
+        my = -1 if me.y > target.y + 320 else 1 if me.y < target.y + 200 else 0
+
+        shotgun = me.guard >= self.shotgun_cost and 0 < me.y - target.y < self.shotgun_range
+        guard = False
+        if me.guard_ready and not shotgun:
+            for b in world.enemy_bullets:
+                t, cx, cy = closest_approach(me, b)
+                if 0 <= t < 3 and cx * cx + cy * cy < world.hit_radius ** 2:
+                    guard = True
+                    break
+        return Action(mx, my, True, shotgun, guard)
+
+POLICIES = {
+    "idle": Bot,
+    "dodger": DodgerBot,
+    "greedy": GreedyShooterBot,
+}
+
+def make_bot(name):
+    try:
+        return POLICIES[name]()
+    except KeyError:
+        raise ValueError(f"unknown bot policy {name!r} (choose from {', '.join(POLICIES)})")
@@ -0,0 +1,124 @@
+"""Display-free stand-ins for the Tk root and canvas.
+
+They implement only the calls Game makes. After callbacks run on a virtual
+clock that HeadlessRoot.advance() moves forward, so a headless game runs as
+fast as the simulation allows.
+"""
+import heapq, itertools
+
+class HeadlessRoot:
+    def __init__(self, width=800, height=800):
+        self.width = width
+        self.height = height
+        self.clock = 0
+        self.queue = []
+        self.pending = {}
+        self.seq = itertools.count()
+        self.destroyed = False
+
+    def after(self, ms, func, *args):
+        n = next(self.seq)
+        self.pending[n] = getattr(func, "__name__", type(func).__name__)
+        heapq.heappush(self.queue, (self.clock + ms, n, func, args))
+        return f"after#{n}"
+
+    def after_cancel(self, aid):
+        try:
+            self.pending.pop(int(str(aid).split("#")[1]), None)
+        except (IndexError, ValueError):
+            pass
+
+    def advance(self, ms):
+        end = self.clock + ms
+        q = self.queue
+        while q and q[0][0] <= end and not self.destroyed:
+            due, n, func, args = heapq.heappop(q)
+            self.clock = due
+            if self.pending.pop(n, None) is not None:
+                func(*args)
+        self.clock = end
+
+    def pending_names(self):
+        return list(self.pending.values())
+
+    def destroy(self):
+        self.destroyed = True
+
+    def bind(self, *args): pass
+    def title(self, *args): pass
+    def geometry(self, *args): pass
+    def protocol(self, *args): pass
+    def config(self, **kw): pass
+    def attributes(self, *args): return 0
+    def update_idletasks(self): pass
+    def mainloop(self): pass
+
+class HeadlessCanvas:
+    def __init__(self, root):
+        self.root = root
+        self.items = {}
+        self.ids = itertools.count(1)
+
+    def _create(self, kind, coords, kw):
+        i = next(self.ids)
+        self.items[i] = [kind, list(coords), kw]
+        return i
+
+    def create_image(self, x, y, **kw):
+        kw["image"] = str(kw.get("image", ""))
+        return self._create("image", (x, y), kw)
+
+    def create_text(self, x, y, **kw): return self._create("text", (x, y), kw)
+    def create_oval(self, *coords, **kw): return self._create("oval", coords, kw)
+    def create_rectangle(self, *coords, **kw): return self._create("rectangle", coords, kw)
+
+    def type(self, item):
+        it = self.items.get(item)
+        return it[0] if it else ""
+
+    def coords(self, item, *coords):
+        it = self.items.get(item)
+        if coords:
+            if it:
+                it[1] = list(coords)
+            return None
+        return list(it[1]) if it else []
+
+    def move(self, item, dx, dy):
+        it = self.items.get(item)
+        if it:
+            c = it[1]
+            for j in range(0, len(c), 2):
+                c[j] += dx
+                c[j + 1] += dy
+
+    def delete(self, item):
+        if item == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item, None)
+
+    def itemconfig(self, item, **kw):
+        it = self.items.get(item)
+        if it:
+            if "image" in kw:
+                kw["image"] = str(kw["image"])
+            it[2].update(kw)
+
+    def itemcget(self, item, option):
+        it = self.items.get(item)
+        return it[2].get(option, "") if it else ""
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def tag_lower(self, item): pass
+
+    def after(self, ms, func, *args):
+        return self.root.after(ms, func, *args)
+
+    def after_cancel(self, aid):
+        self.root.after_cancel(aid)
+
+    def winfo_width(self): return self.root.width
+    def winfo_height(self): return self.root.height
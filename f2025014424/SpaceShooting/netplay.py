@@ -0,0 +1,205 @@
+"""Online co-op: lockstep input exchange plus a small relay server.
+
+Only per-tick input bitmasks travel over the wire (7 bytes per player per
+tick), never game state. Every peer runs the same deterministic simulation
+from the seed the relay hands out at START.
+
+Run a relay for testing with:
+    python netplay.py --port 7777 --players 2
+"""
+import asyncio, struct, socket, threading, queue, random, argparse
+
+DEFAULT_PORT = 7777
+INPUT_DELAY = 4
+
+MSG_HELLO = 1
+MSG_START = 2
+MSG_INPUT = 3
+MSG_BYE = 4
+
+START_FMT = struct.Struct("<BBI")
+INPUT_FMT = struct.Struct("<BIB")
+BYE_FMT = struct.Struct("<B")
+
+IN_LEFT = 1
+IN_RIGHT = 2
+IN_UP = 4
+IN_DOWN = 8
+IN_FIRE = 16
+IN_SHOTGUN = 32
+IN_GUARD = 64
+
+def _nodelay(writer):
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+class Lockstep:
+    def __init__(self, players, slot, delay=INPUT_DELAY):
+        self.players = players
+        self.slot = slot
+        self.delay = delay
+        self.frame = 0
+        self.inputs = {f: [0] * players for f in range(delay)}
+        self.dropped = set()
+
+    def add(self, slot, frame, bits):
+        if frame < self.frame or not 0 <= slot < self.players:
+            return
+        self.inputs.setdefault(frame, [None] * self.players)[slot] = bits
+
+    def drop(self, slot):
+        self.dropped.add(slot)
+
+    def ready(self):
+        row = self.inputs.get(self.frame)
+        if row is None:
+            return None
+        row = [0 if b is None and s in self.dropped else b for s, b in enumerate(row)]
+        return None if None in row else row
+
+    def advance(self):
+        self.inputs.pop(self.frame, None)
+        self.frame += 1
+
+class NetClient:
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.inbox = queue.Queue()
+        self.loop = asyncio.new_event_loop()
+        self.writer = None
+        self.thread = threading.Thread(target=self._run, name="netplay", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self.loop.close()
+
+    async def _main(self):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self.inbox.put(("closed", str(e)))
+            return
+        _nodelay(writer)
+        self.writer = writer
+        writer.write(bytes([MSG_HELLO]))
+
+        reason = "disconnected"
+        try:
+            while True:
+                t = (await reader.readexactly(1))[0]
+                if t == MSG_START:
+                    n, slot, seed = START_FMT.unpack(await reader.readexactly(START_FMT.size))
+                    self.inbox.put(("start", n, slot, seed))
+                elif t == MSG_INPUT:
+                    slot, frame, bits = INPUT_FMT.unpack(await reader.readexactly(INPUT_FMT.size))
+                    self.inbox.put(("input", slot, frame, bits))
+                elif t == MSG_BYE:
+                    (slot,) = BYE_FMT.unpack(await reader.readexactly(BYE_FMT.size))
+                    self.inbox.put(("bye", slot))
+                else:
+                    reason = f"bad message {t}"
+                    break
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        self.writer = None
+        writer.close()
+        self.inbox.put(("closed", reason))
+
+    def _write(self, data):
+        if self.writer is not None:
+            self.writer.write(data)
+
+    def send_input(self, slot, frame, bits):
+        data = bytes([MSG_INPUT]) + INPUT_FMT.pack(slot, frame, bits)
+        try:
+            self.loop.call_soon_threadsafe(self._write, data)
+        except RuntimeError:
+            pass
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        def shut():
+            if self.writer is not None:
+                self.writer.close()
+        try:
+            self.loop.call_soon_threadsafe(shut)
+        except RuntimeError:
+            pass
+
+class RelayServer:
+    def __init__(self, players=2):
+        self.players = players
+        self.writers = {}
+        self.started = False
+
+    def broadcast(self, data, skip=None):
+        for slot, w in list(self.writers.items()):
+            if slot != skip:
+                w.write(data)
+
+    async def handle(self, reader, writer):
+        _nodelay(writer)
+        slot = None
+        try:
+            hello = await reader.readexactly(1)
+            if hello[0] != MSG_HELLO or self.started or len(self.writers) >= self.players:
+                return
+            slot = min(s for s in range(self.players) if s not in self.writers)
+            self.writers[slot] = writer
+
+            if len(self.writers) == self.players:
+                self.started = True
+                seed = random.getrandbits(32)
+                for s, w in self.writers.items():
+                    w.write(bytes([MSG_START]) + START_FMT.pack(self.players, s, seed))
+
+            while True:
+                t = (await reader.readexactly(1))[0]
+                if t != MSG_INPUT:
+                    break
+                body = await reader.readexactly(INPUT_FMT.size)
+                if INPUT_FMT.unpack(body)[0] != slot:
+                    break
+                self.broadcast(bytes([MSG_INPUT]) + body, skip=slot)
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            if slot is not None and self.writers.get(slot) is writer:
+                del self.writers[slot]
+                self.broadcast(bytes([MSG_BYE]) + BYE_FMT.pack(slot))
+                if not self.writers:
+                    self.started = False
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="SpaceShooting lockstep relay")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--players", type=int, default=2)
+    args = ap.parse_args()
+    print(f"relay on {args.host}:{args.port} for {args.players} players", flush=True)
+    try:
+        asyncio.run(RelayServer(args.players).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,166 @@
+"""Session telemetry: per-tick, per-player samples stored as a columnar file.
+
+File layout (little-endian):
+    header : b"SSTL" u16 version, u16 field count, then per field
+             u8 name length, name bytes, 1 byte array typecode
+    chunks : u32 row count, then each column's values back to back
+
+Each tick adds one row per player slot. t_ms is wall-clock time since the
+writer was opened and never goes back; sim_ms is the game's simulation clock,
+which restarts with every game, and game counts the games of the session.
+
+Columns are written in chunks by a background thread, so the game loop only
+appends tuples. Opening a writer starts a new session and replaces any file
+already at the path. Use load_session() to read a file back as NumPy arrays.
+"""
+import os, struct, sys, threading, queue, time
+from array import array
+
+MAGIC = b"SSTL"
+VERSION = 1
+CHUNK_ROWS = 512
+
+FIELDS = [
+    ("t_ms", "I"),
+    ("sim_ms", "I"),
+    ("game", "H"),
+    ("slot", "B"),
+    ("frame_us", "I"),
+    ("stage", "H"),
+    ("score", "I"),
+    ("x", "f"),
+    ("y", "f"),
+    ("hp", "b"),
+    ("guard", "f"),
+    ("flags", "B"),
+    ("enemies", "I"),
+    ("player_bullets", "I"),
+    ("enemy_bullets", "I"),
+    ("boss_hp", "i"),
+]
+
+FLAG_GUARDING = 1
+FLAG_GUARD_BROKEN = 2
+FLAG_PAUSED = 4
+FLAG_TITLE = 8
+FLAG_GAME_OVER = 16
+FLAG_BOSS = 32
+
+NUMPY_TYPES = {"b": "i1", "B": "u1", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4", "f": "<f4", "d": "<f8"}
+
+def _header():
+    out = bytearray(MAGIC)
+    out += struct.pack("<HH", VERSION, len(FIELDS))
+    for name, code in FIELDS:
+        raw = name.encode("ascii")
+        out += struct.pack("<B", len(raw)) + raw + code.encode("ascii")
+    return bytes(out)
+
+class TelemetryWriter:
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.rows = []
+        self.start = time.perf_counter()
+        self.closed = False
+
+        self.f = open(path, "wb")
+        self.f.write(_header())
+        self.q = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def sample(self, row):
+        if self.closed:
+            return
+        self.rows.append((int((time.perf_counter() - self.start) * 1000),) + tuple(row))
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self.closed:
+            self.rows = []
+        elif self.rows:
+            self.q.put(self.rows)
+            self.rows = []
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self.q.put(None)
+        self.thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            rows = self.q.get()
+            if rows is None:
+                break
+            try:
+                self.f.write(self._encode(rows))
+                self.f.flush()
+            except Exception as e:
+                self.closed = True
+                print(f"telemetry: stopped recording: {e}", file=sys.stderr)
+                break
+        while True:
+            try:
+                self.q.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            self.f.close()
+        except OSError:
+            pass
+
+    def _encode(self, rows):
+        out = bytearray(struct.pack("<I", len(rows)))
+        for (name, code), col in zip(FIELDS, zip(*rows)):
+            a = array(code, col)
+            if sys.byteorder == "big":
+                a.byteswap()
+            out += a.tobytes()
+        return bytes(out)
+
+def _read_header(buf):
+    if buf[:4] != MAGIC:
+        raise ValueError("not a telemetry file")
+    version, n = struct.unpack_from("<HH", buf, 4)
+    if version != VERSION:
+        raise ValueError(f"unsupported telemetry version {version}")
+    pos = 8
+    fields = []
+    for _ in range(n):
+        ln = buf[pos]; pos += 1
+        name = bytes(buf[pos:pos + ln]).decode("ascii"); pos += ln
+        code = chr(buf[pos]); pos += 1
+        fields.append((name, code))
+    return fields, pos
+
+def load_session(path):
+    import numpy as np
+
+    with open(path, "rb") as f:
+        buf = f.read()
+    fields, pos = _read_header(buf)
+    dtypes = [np.dtype(NUMPY_TYPES[code]) for _, code in fields]
+    row_size = sum(dt.itemsize for dt in dtypes)
+
+    parts = [[] for _ in fields]
+    while pos + 4 <= len(buf):
+        (n,) = struct.unpack_from("<I", buf, pos)
+        if pos + 4 + n * row_size > len(buf):
+            break
+        pos += 4
+        for i, dt in enumerate(dtypes):
+            parts[i].append(np.frombuffer(buf, dtype=dt, count=n, offset=pos))
+            pos += n * dt.itemsize
+
+    out = {}
+    for (name, _), dt, chunks in zip(fields, dtypes, parts):
+        out[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=dt)
+    return out